@@ -0,0 +1,5 @@
+import uvicorn
+
+if __name__ == "__main__":
+    # Development entry point: single process with auto-reload on code changes.
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
@@ -1,6 +1,6 @@
-from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI
 import uvicorn
+import os
 import time
 from contextlib import asynccontextmanager
 from proxy.utils import logger, log_listener
@@ -14,34 +14,100 @@ http_client = None
 async def lifespan(app: FastAPI):
     # Startup
     global http_client
-    http_client = httpx.AsyncClient()
+    http_client = httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_connections=1000, max_keepalive_connections=500),
+        # Fail fast on connect but allow long completions; the OpenAI SDK adopts this as its request timeout
+        timeout=httpx.Timeout(600.0, connect=5.0),
+    )
     # Share functionality with routers via app.state
     app.state.http_client = http_client
+    await bedrock.start_clients()
     logger.info("Startup: Connection pools initialized.")
     
     yield
     
     # Shutdown
     await http_client.aclose()
-    log_listener.stop()
+    await bedrock.close_clients()
     logger.info("Shutdown: Connection pools closed.")
+    # Stop last so the shutdown record above is still drained by the listener
+    log_listener.stop()
 
 app = FastAPI(title="AI Proxy", description="Async Proxy for Azure OpenAI and AWS Bedrock", version="0.1.0", lifespan=lifespan)
 
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
+class TimingLogMiddleware:
     """
-    Middleware to log request details and execution time.
+    Pure ASGI middleware to log request details and execution time.
+    Avoids BaseHTTPMiddleware's per-request task and Request/Response construction.
     """
-    start_time = time.time()
-    response = await call_next(request)
-    process_time = time.time() - start_time
-    
-    logger.info(
-        f"Path: {request.url.path} | Method: {request.method} | "
-        f"Status: {response.status_code} | Duration: {process_time:.4f}s"
-    )
-    return response
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            process_time = time.perf_counter() - start
+            logger.info(
+                "Path: %s | Method: %s | Status: %s | Duration: %.4fs",
+                scope["path"], scope["method"], status_code, process_time
+            )
+
+app.add_middleware(TimingLogMiddleware)
+
+class ProfilerMiddleware:
+    """
+    Pure ASGI middleware that profiles a request with pyinstrument when `profile=1`
+    is in the query string, and returns the HTML report instead of the response.
+    """
+    def __init__(self, app):
+        from pyinstrument import Profiler
+        self.app = app
+        self.profiler_cls = Profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or b"profile=1" not in scope["query_string"]:
+            await self.app(scope, receive, send)
+            return
+
+        async def discard(message):
+            pass
+
+        profiler = self.profiler_cls(async_mode="enabled")
+        profiler.start()
+        try:
+            await self.app(scope, receive, discard)
+        finally:
+            profiler.stop()
+
+        html = profiler.output_html().encode()
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/html; charset=utf-8"),
+                (b"content-length", str(len(html)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": html})
+
+# Opt-in only: zero overhead unless explicitly enabled
+if os.getenv("PROXY_PROFILING") == "1":
+    app.add_middleware(ProfilerMiddleware)
 
 @app.get("/health")
 async def health_check():
@@ -51,4 +117,15 @@ app.include_router(azure.router, prefix="/azure")
 app.include_router(bedrock.router, prefix="/bedrock")
 
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    # Production entry point: uvloop event loop + httptools parser, one worker per core (max 4).
+    # keep-alive is raised so idle long-lived LLM streaming connections aren't dropped early.
+    # Use dev.py for the auto-reload variant.
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        workers=min(4, os.cpu_count() or 1),
+        timeout_keep_alive=75,
+    )
@@ -1,10 +1,12 @@
 import os
-import json
+import logging
+import orjson
 import re
+from functools import partial
 from fastapi import APIRouter, Request, HTTPException
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi.responses import JSONResponse, Response
 from openai import AsyncAzureOpenAI, APIError
-from proxy.utils import logger
+from proxy.utils import logger, ClosingStreamingResponse
 
 router = APIRouter()
 
@@ -36,13 +38,17 @@ async def azure_proxy(request: Request, path: str):
         raise HTTPException(status_code=401, detail="Missing api-key header")
 
     # 3. Parse Body
+    # Read the raw bytes once: they are parsed with orjson and logged as-is,
+    # so the body is never re-serialized just for the log line.
+    raw = await request.body()
     try:
-        body = await request.json()
-    except Exception:
+        body = orjson.loads(raw)
+    except orjson.JSONDecodeError:
         body = {}
 
     # Log Input
-    logger.info(f"Azure Request Input: {json.dumps(body)}")
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Azure Request Input: %s", raw.decode('utf-8', errors='replace'))
 
     # 4. Prepare Client
     # Reuse global http client from app state
@@ -74,73 +80,109 @@ async def azure_proxy(request: Request, path: str):
         if "model" not in body:
              body["model"] = deployment_id
 
-        response = await client.chat.completions.create(**body)
-        
         if body.get("stream", False):
-             return StreamingResponse(
-                stream_response_generator(response),
-                media_type="application/json"
+             # Relay the upstream SSE bytes as-is instead of re-serializing SDK chunks.
+             # The response context is entered here so API errors still surface below,
+             # and is closed when the response ends, even if the body is never iterated.
+             stream_ctx = client.chat.completions.with_streaming_response.create(**body)
+             raw_response = await stream_ctx.__aenter__()
+             return ClosingStreamingResponse(
+                stream_response_generator(raw_response),
+                on_close=partial(stream_ctx.__aexit__, None, None, None),
+                media_type="text/event-stream"
             )
         else:
-            # Non-streaming response is an object, need to serialize
-            # response is a ChatCompletion object
-            # We can use .model_dump() or .to_dict() (depending on version, model_dump is pydantic v2 in v1.x sdk)
-            response_dict = response.model_dump()
+            response = await client.chat.completions.create(**body)
+
+            # Non-streaming response is a ChatCompletion object: read usage/text as attributes
+            # and let pydantic serialize it straight to JSON, skipping the intermediate dict.
             
             # Log usage
-            usage = response_dict.get("usage", {})
-            total_tokens = usage.get("total_tokens", 0)
+            usage = response.usage
+            total_tokens = usage.total_tokens if usage else 0
             if total_tokens > 0:
-                 logger.info(f"Azure Request Finished | Total Tokens: {total_tokens}")
+                 logger.info("Azure Request Finished | Total Tokens: %s", total_tokens)
 
             # Log Output (Text of choices)
-            output_text = ""
-            for choice in response_dict.get("choices", []):
-                msg = choice.get("message", {})
-                content = msg.get("content", "")
-                if content:
-                    output_text += content
-            
-            logger.info(f"Azure Response Output: {output_text}")
+            if logger.isEnabledFor(logging.INFO):
+                output_text = "".join(
+                    choice.message.content
+                    for choice in response.choices
+                    if choice.message and choice.message.content
+                )
+                logger.info("Azure Response Output: %s", output_text)
 
-            return JSONResponse(content=response_dict)
+            return Response(content=response.model_dump_json(), media_type="application/json")
 
     except APIError as e:
-        logger.error(f"Azure OpenAI Error: {e}")
+        logger.error("Azure OpenAI Error: %s", e)
         # Return a json response with the error details
         return JSONResponse(status_code=e.status_code or 500, content={"error": e.message})
     except Exception as e:
-        logger.error(f"Internal Error: {e}")
+        logger.error("Internal Error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
-async def stream_response_generator(response_iterator):
+async def stream_response_generator(raw_response):
     """
-    Yields chunks from the SDK async iterator and accumulates usage/text.
+    Relays upstream SSE events as raw bytes and accumulates usage/text.
+    Events are split on blank lines framed with either LF or CRLF line endings.
     """
-    output_text = ""
-    # The iterator yields ChatCompletionChunk objects
-    async for chunk in response_iterator:
-        # Convert chunk to dict for logging/serialization
-        chunk_dict = chunk.model_dump()
-        
-        # Serialize to SSE format: data: {...}
-        yield f"data: {json.dumps(chunk_dict)}\n\n"
-        
-        # Usage check
-        usage = chunk_dict.get("usage", None)
-        if usage:
-            total = usage.get("total_tokens", 0)
-            logger.info(f"Azure Stream Finished (Usage Reported) | Total Tokens: {total}")
-        
-        # Output text accumulation
-        choices = chunk_dict.get("choices", [])
-        for choice in choices:
-            delta = choice.get("delta", {})
-            content = delta.get("content", "")
-            if content:
-                output_text += content
-
-    yield "data: [DONE]\n\n"
-    
-    logger.info(f"Azure Stream Output: {output_text}")
+    parts: list[str] = []
+    # Content deltas are only parsed out of the byte stream when the output line will be logged
+    log_enabled = logger.isEnabledFor(logging.INFO)
+    # Usage arrives in the final chunk; remember it and log once after the stream
+    total_tokens = None
+    buf = bytearray()
+    delim = None
+    async for data in raw_response.iter_bytes():
+        buf.extend(data)
+        if delim is None:
+            # Framing is fixed for a response: pick the event boundary from the first line ending
+            nl = buf.find(b"\n")
+            if nl == -1:
+                continue
+            delim = b"\r\n\r\n" if nl and buf[nl - 1] == 0x0D else b"\n\n"
+        # Split on SSE event boundaries and pass each event through untouched
+        while (i := buf.find(delim)) != -1:
+            end = i + len(delim)
+            event = bytes(buf[:end])
+            del buf[:end]
+            yield event
+
+            if not event.startswith(b"data: ") or event.startswith(b"data: [DONE]"):
+                continue
+
+            # Byte-scan first and only parse events carrying something we log:
+            # a non-null "usage" (final chunk only) or a text delta when output logging is on.
+            u = event.find(b'"usage":')
+            has_usage = u != -1 and not event.startswith(b"null", u + 8)
+            has_content = log_enabled and b'"content":"' in event
+            if not (has_usage or has_content):
+                continue
+            try:
+                chunk_dict = orjson.loads(event[6:i])
+            except orjson.JSONDecodeError:
+                continue
+
+            # Usage check
+            usage = chunk_dict.get("usage", None)
+            if usage:
+                total_tokens = usage.get("total_tokens", 0)
+
+            # Output text accumulation
+            if has_content:
+                choices = chunk_dict.get("choices", [])
+                for choice in choices:
+                    delta = choice.get("delta") or {}
+                    content = delta.get("content", "")
+                    if content:
+                        parts.append(content)
+
+    if buf:
+        yield bytes(buf)
+
+    if total_tokens is not None:
+        logger.info("Azure Stream Finished (Usage Reported) | Total Tokens: %s", total_tokens)
+    if log_enabled:
+        logger.info("Azure Stream Output: %s", "".join(parts))
@@ -1,61 +1,198 @@
-from fastapi import APIRouter, Request, HTTPException, Response
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi import APIRouter, Request, HTTPException
+from fastapi.responses import Response
 import aioboto3
+import boto3
 import os
-import json
-from proxy.utils import logger
+import asyncio
+import base64
+import logging
+import orjson
+from functools import partial
+from aiobotocore.config import AioConfig
+from aiobotocore.credentials import AioRefreshableCredentials
+from aiobotocore.session import get_session as get_botocore_session
+from types import MappingProxyType
+from typing import Any
+from proxy.utils import logger, LazyJSON, ClosingStreamingResponse
 
 router = APIRouter()
 session = aioboto3.Session()
 REGION = os.getenv("AWS_REGION", "eu-central-1")
 ROLE_ARN = os.getenv("AWS_ROLE_ARN")
+# Upper bound on in-flight Bedrock calls; the client connection pools are sized to match
+MAX_CONCURRENCY = int(os.getenv("BEDROCK_MAX_CONCURRENCY", "32"))
+_BEDROCK_SEM = asyncio.Semaphore(MAX_CONCURRENCY)
+# Fail fast on connect, allow long gaps between streamed reads, and keep idle pooled TLS connections
+# reusable for 60s (aiohttp's keepalive_timeout; aiobotocore defaults it to 12s)
+_CLIENT_CONFIG = AioConfig(
+    max_pool_connections=MAX_CONCURRENCY,
+    connect_timeout=3,
+    read_timeout=120,
+    connector_args={"keepalive_timeout": 60},
+)
 
-        )
-        return resp["Credentials"]
-
-# Client Cache to avoid session creation overhead
-# Key: (region, role_arn or None) -> client
-# Since aioboto3 clients are async context managers, we need to manage their lifecycle carefully.
-# Simplified approach: Use a global session and just create clients. aioboto3 session is thread safe.
-# Actually, best practice for high scale with aioboto3 is to create one session per event loop (which we effectively have here)
-# and reuse clients? No, clients in aioboto3 are context managers.
-# Strategy: Use 'service' abstraction or keep session global (already is).
-# The overhead is mainly in `session.client` creation and credential resolution.
-# We will optimize by resolving credentials once per request (or caching credentials?) and ensuring session is reused.
-# Actually, the biggest gain is reusing the underlying botocore session logic.
-# The `session` variable is already global in this file. That helps.
-# But we can't easily cache open 'client' objects because they are async context managers meant for 'async with'.
-# However, we can use `await session.create_client(...)` without `async with` if we manage closing,
-# BUT simpler optimization for now:
-# 1. Reuse credentials if possible (boto3 does this internally via its credential provider chain).
-# 2. Reusing session is key. We are doing that.
-# 3. For assumes role, we are fetching credentials every time! This is SLOW. We must cache the assumed role credentials.
-
-import time
-_creds_cache = {"data": None, "expiry": 0}
-
-async def get_credentials():
+# Streaming runtime methods -> response key holding the event stream
+_STREAM_KEYS = MappingProxyType({
+    "invoke_model_with_response_stream": "body",
+    "converse_stream": "stream",
+})
+
+# Raw request/response bodies are truncated to this many bytes in logs to avoid log amplification
+_LOG_BODY_LIMIT = 4096
+
+# Read size when relaying an InvokeModel body; the StreamingBody default (1KB) costs one ASGI send per KB
+_BODY_CHUNK_SIZE = 64 * 1024
+
+# Stream responses are Server-Sent Events; disable client caching and proxy (nginx) buffering
+_SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+# Client Cache to avoid per-request client creation overhead
+# botocore endpoint/loader/signer construction is expensive, so clients are entered once
+# (without `async with`) and reused across requests.
+# Key: service -> (client, client context manager)
+_client_cache: dict[str, tuple[Any, Any]] = {}
+# service -> URL operation name -> (method name, bound client method, stream key), built from the
+# service model when the client is created. Only API operations are listed, so client helpers
+# (close, get_paginator, generate_presigned_url, ...) are never reachable from the URL.
+_DISPATCH: dict[str, MappingProxyType] = {}
+_client_lock = asyncio.Lock()
+# Session the Bedrock clients are created from: `session` itself, or a session carrying
+# refreshable assumed role credentials when AWS_ROLE_ARN is set
+_client_session = None
+
+# Plain boto3 STS client, only needed when assuming a role. boto3 clients are thread safe, so the
+# rare refresh runs in the default executor without paying aioboto3's client/session overhead.
+_sts_client = boto3.client("sts", region_name=REGION) if ROLE_ARN else None
+
+def _sync_assume_role():
+    resp = _sts_client.assume_role(
+        RoleArn=ROLE_ARN,
+        RoleSessionName="ProxySession",
+        DurationSeconds=3600
+    )
+    creds = resp["Credentials"]
+    return {
+        "access_key": creds["AccessKeyId"],
+        "secret_key": creds["SecretAccessKey"],
+        "token": creds["SessionToken"],
+        "expiry_time": creds["Expiration"].isoformat(),
+    }
+
+async def _refresh_role_credentials():
+    return await asyncio.get_running_loop().run_in_executor(None, _sync_assume_role)
+
+async def _get_client_session():
     """
-    Returns credentials dictionary. Caches assumed role credentials to avoid calling STS every request.
+    Returns the session Bedrock clients are built from. With AWS_ROLE_ARN set, the session's
+    credentials are refreshed by botocore itself ahead of expiry, so the request path never calls STS.
     """
-    if not ROLE_ARN:
-        return None
-    
-    now = time.time()
-    if _creds_cache["data"] and _creds_cache["expiry"] > now:
-        return _creds_cache["data"]
-        
-    async with session.client("sts", region_name=REGION) as sts:
-        resp = await sts.assume_role(
-            RoleArn=ROLE_ARN,
-            RoleSessionName="ProxySession",
-            DurationSeconds=3600
-        )
-        creds = resp["Credentials"]
-        _creds_cache["data"] = creds
-        # Expire 5 minutes before actual expiration
-        _creds_cache["expiry"] = creds["Expiration"].timestamp() - 300 
-        return creds
+    global _client_session
+    if _client_session is None:
+        if ROLE_ARN:
+            credentials = AioRefreshableCredentials.create_from_metadata(
+                metadata=await _refresh_role_credentials(),
+                refresh_using=_refresh_role_credentials,
+                method="sts-assume-role",
+            )
+            botocore_session = get_botocore_session()
+            botocore_session._credentials = credentials
+            _client_session = aioboto3.Session(botocore_session=botocore_session, region_name=REGION)
+        else:
+            _client_session = session
+    return _client_session
+
+async def get_bedrock_client(service: str):
+    """
+    Returns a long-lived client for `service`, creating it on first use.
+    """
+    entry = _client_cache.get(service)
+    if entry:
+        return entry[0]
+
+    async with _client_lock:
+        # Another request may have created it while we waited
+        entry = _client_cache.get(service)
+        if entry:
+            return entry[0]
+
+        client_session = await _get_client_session()
+        client_cm = client_session.client(service, region_name=REGION, config=_CLIENT_CONFIG)
+        client = await client_cm.__aenter__()
+        _DISPATCH[service] = _build_dispatch(client)
+        _client_cache[service] = (client, client_cm)
+        return client
+
+def _build_dispatch(client) -> MappingProxyType:
+    # Accept the API name (ConverseStream), its camelCase form (converseStream) and the boto3
+    # spellings (converse_stream, converse-stream)
+    dispatch = {}
+    for method_name, api_name in client.meta.method_to_api_mapping.items():
+        # The service model can list operations the client never builds a method for
+        # (e.g. invoke_model_with_bidirectional_stream); those are simply not routable
+        method = getattr(client, method_name, None)
+        if method is None:
+            continue
+        entry = (method_name, method, _STREAM_KEYS.get(method_name))
+        dispatch[api_name] = entry
+        dispatch[api_name[:1].lower() + api_name[1:]] = entry
+        dispatch[method_name] = entry
+        dispatch[method_name.replace("_", "-")] = entry
+    return MappingProxyType(dispatch)
+
+async def start_clients():
+    """
+    Resolves credentials and builds the runtime clients ahead of the first request,
+    so no request pays for client construction. Connections are still opened lazily:
+    the first calls on a fresh pool pay their own TLS handshakes.
+    Called on application startup.
+    """
+    await get_bedrock_client("bedrock-runtime")
+    await get_bedrock_client("bedrock-agent-runtime")
+
+async def close_clients():
+    """
+    Closes every cached client. Called on application shutdown.
+    """
+    async with _client_lock:
+        entries = list(_client_cache.values())
+        _client_cache.clear()
+        _DISPATCH.clear()
+    for _, client_cm in entries:
+        await client_cm.__aexit__(None, None, None)
+
+def resolve_operation(service: str, operation: str):
+    """
+    Returns (method name, client method, stream key) for an API operation of `service`, or a 404.
+    """
+    entry = _DISPATCH[service].get(operation)
+    if entry is None:
+        raise HTTPException(status_code=404, detail=f"Operation {operation} not found")
+    return entry
+
+# (service, method name) -> accepted top-level parameter names, read once from the service model
+_PARAM_NAMES: dict[tuple[str, str], frozenset[str]] = {}
+
+def validate_params(client, method_name: str, body, operation: str):
+    """
+    Rejects bodies that can't be splatted into the operation (non-object, unknown keys) with a 400,
+    and methods that aren't service operations with a 404, before any request is signed or sent.
+    """
+    if not isinstance(body, dict):
+        raise HTTPException(status_code=400, detail="Request body must be a JSON object")
+
+    key = (client.meta.service_model.service_name, method_name)
+    names = _PARAM_NAMES.get(key)
+    if names is None:
+        api_name = client.meta.method_to_api_mapping.get(method_name)
+        if api_name is None:
+            raise HTTPException(status_code=404, detail=f"Operation {operation} not found")
+        input_shape = client.meta.service_model.operation_model(api_name).input_shape
+        names = frozenset(input_shape.members) if input_shape else frozenset()
+        _PARAM_NAMES[key] = names
+
+    unknown = body.keys() - names
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown parameters for {operation}: {', '.join(sorted(unknown))}")
 
 @router.post("/runtime/{operation}")
 async def bedrock_runtime(operation: str, request: Request):
@@ -65,195 +202,227 @@ async def bedrock_runtime(operation: str, request: Request):
     However, aioboto3 client methods take arguments matching the API.
     We receive a JSON body matching the boto3 arguments for the operation.
     """
-    body = await request.json()
-    
-    method_name = operation_to_method(operation)
-    
-    # Check if this is a streaming operation
-    is_stream = method_name in ["invoke_model_with_response_stream", "converse_stream"]
-    
-    creds = await get_credentials()
-    kwargs = {"region_name": REGION}
-    if creds:
-        kwargs.update({
-            "aws_access_key_id": creds["AccessKeyId"],
-            "aws_secret_access_key": creds["SecretAccessKey"],
-            "aws_session_token": creds["SessionToken"]
-        })
-
+    raw = await request.body()
+    body = orjson.loads(raw)
     
     # Log Input
-    logger.info(f"Bedrock Runtime Input ({operation}): {json.dumps(body)}")
-
-            if is_stream:
-                # Pass parameters to generator to create client inside
-                return StreamingResponse(
-                    bedrock_stream_generator(body, method_name, kwargs, operation),
-                    media_type="application/json"
-                )
-            else:
-                async with session.client("bedrock-runtime", **kwargs) as client:
-                    method = getattr(client, method_name, None)
-                    if not method:
-                        raise HTTPException(status_code=404, detail=f"Operation {operation} not found")
-                    
-                    response = await method(**body)
-                    
-                    # Extract Usage
-                    input_tokens = 0
-                    output_tokens = 0
-                
-                    
-                    # Headers for InvokeModel
-                    if "ResponseMetadata" in response:
-                        headers = response["ResponseMetadata"].get("HTTPHeaders", {})
-                        input_tokens = int(headers.get("x-amzn-bedrock-input-token-count", 0))
-                        output_tokens = int(headers.get("x-amzn-bedrock-output-token-count", 0))
-    
-                    # Body usage for Converse
-                    if "usage" in response:
-                        input_tokens = response["usage"].get("inputTokens", 0)
-                        output_tokens = response["usage"].get("outputTokens", 0)
-    
-                    logger.info(f"Bedrock {operation} Finished | Tokens: {input_tokens + output_tokens} (Input: {input_tokens}, Output: {output_tokens})")
-    
-                    # Parse body stream if needed (InvokeModel returns 'body' as StreamingBody)
-                    if "body" in response and hasattr(response["body"], "read"):
-                        response_body = await response["body"].read()
-                        logger.info(f"Bedrock Response Body: {response_body.decode('utf-8', errors='replace')}")
-                        return Response(content=response_body, media_type="application/json")
-                    
-                    # Check for outputText/output/etc in standard response
-                    logger.info(f"Bedrock Response Output: {json.dumps(response, default=str)}")
-    
-                    # Clean ResponseMetadata from JSON response if we want pure data, but keeping it is fine.
-                    # Remove non-serializable objects
-                    clean_response = {k: v for k, v in response.items() if k != "body"}
-                    return JSONResponse(content=clean_response)
-        
-        except Exception as e:
-            logger.error(f"Bedrock Error ({operation}): {e}")
-            raise HTTPException(status_code=500, detail=str(e))
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Bedrock Runtime Input (%s): %s", operation, raw[:_LOG_BODY_LIMIT].decode('utf-8', errors='replace'))
+
+    try:
+        client = await get_bedrock_client("bedrock-runtime")
+        # stream_key is set for streaming operations: the response key holding the event stream
+        method_name, method, stream_key = resolve_operation("bedrock-runtime", operation)
+        validate_params(client, method_name, body, operation)
+
+        if stream_key:
+            # Closing the generator when the response ends runs its cleanup even if the client
+            # disconnected mid-stream, instead of waiting for garbage collection
+            events = bedrock_stream_generator(method, body, stream_key)
+            return ClosingStreamingResponse(
+                events,
+                on_close=events.aclose,
+                media_type="text/event-stream",
+                headers=_SSE_HEADERS
+            )
+        else:
+            # InvokeModel's StreamingBody keeps its pooled connection checked out until it is relayed,
+            # so in that case the slot is handed to the response and released when it closes
+            handed_off = False
+            await _BEDROCK_SEM.acquire()
+            try:
+                response = await method(**body)
+            
+                # Extract Usage
+                input_tokens = 0
+                output_tokens = 0
+
+                # Headers for InvokeModel
+                if "ResponseMetadata" in response:
+                    headers = response["ResponseMetadata"].get("HTTPHeaders", {})
+                    input_tokens = int(headers.get("x-amzn-bedrock-input-token-count", 0))
+                    output_tokens = int(headers.get("x-amzn-bedrock-output-token-count", 0))
+
+                # Body usage for Converse
+                if "usage" in response:
+                    input_tokens = response["usage"].get("inputTokens", 0)
+                    output_tokens = response["usage"].get("outputTokens", 0)
+
+                logger.info("Bedrock %s Finished | Tokens: %d (Input: %d, Output: %d)", operation, input_tokens + output_tokens, input_tokens, output_tokens)
+
+                # Stream the body through if needed (InvokeModel returns 'body' as StreamingBody)
+                if "body" in response and hasattr(response["body"], "read"):
+                    streaming_response = ClosingStreamingResponse(
+                        pump_body(response["body"]),
+                        on_close=partial(release_body, response["body"]),
+                        media_type="application/json"
+                    )
+                    handed_off = True
+                    return streaming_response
+            finally:
+                if not handed_off:
+                    _BEDROCK_SEM.release()
+            
+            # Clean ResponseMetadata from JSON response if we want pure data, but keeping it is fine.
+            # Remove non-serializable objects in place (the response dict is not reused),
+            # before logging so the deferred log line serializes exactly what is returned
+            response.pop("body", None)
+
+            # Check for outputText/output/etc in standard response
+            logger.info("Bedrock Response Output: %s", LazyJSON(response))
+            return Response(content=orjson.dumps(response), media_type="application/json")
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Bedrock Error (%s): %s", operation, e)
+        raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/agent-runtime/{operation}")
 async def bedrock_agent_runtime(operation: str, request: Request):
     """
     Handles Bedrock Agent Runtime: Retrieve, RetrieveAndGenerate
     """
-    body = await request.json()
-    logger.info(f"Bedrock Agent Input ({operation}): {json.dumps(body)}")
+    raw = await request.body()
+    body = orjson.loads(raw)
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Bedrock Agent Input (%s): %s", operation, raw[:_LOG_BODY_LIMIT].decode('utf-8', errors='replace'))
     
-    creds = await get_credentials()
-    kwargs = {"region_name": REGION}
-    if creds:
-        kwargs.update({
-            "aws_access_key_id": creds["AccessKeyId"],
-            "aws_secret_access_key": creds["SecretAccessKey"],
-            "aws_session_token": creds["SessionToken"]
-        })
-
-    async with session.client("bedrock-agent-runtime", **kwargs) as client:
-        method = getattr(client, operation_to_method(operation), None)
-        if not method:
-             raise HTTPException(status_code=404, detail=f"Operation {operation} not found")
-
-        try:
-            # We assume non-streaming for agent runtime in this snippet unless specified
+    client = await get_bedrock_client("bedrock-agent-runtime")
+
+    method_name, method, _ = resolve_operation("bedrock-agent-runtime", operation)
+    validate_params(client, method_name, body, operation)
+
+    try:
+        # We assume non-streaming for agent runtime in this snippet unless specified
+        async with _BEDROCK_SEM:
             response = await method(**body)
-            # Log usage? Agent runtime doesn't always return token usage in headers straightforwardly.
-            # We'll log simplified info.
-            logger.info(f"Bedrock Agent {operation} Finished")
-            logger.info(f"Bedrock Agent Output: {json.dumps(response, default=str)}")
-            
-            clean_response = {k: v for k, v in response.items() if k != "body"}
-            return JSONResponse(content=clean_response)
-        except Exception as e:
-            logger.error(f"Bedrock Agent Error ({operation}): {e}")
-            raise HTTPException(status_code=500, detail=str(e))
+        # Log usage? Agent runtime doesn't always return token usage in headers straightforwardly.
+        # We'll log simplified info.
+        logger.info("Bedrock Agent %s Finished", operation)
+        response.pop("body", None)
+        logger.info("Bedrock Agent Output: %s", LazyJSON(response))
+        return Response(content=orjson.dumps(response), media_type="application/json")
+    except Exception as e:
+        logger.error("Bedrock Agent Error (%s): %s", operation, e)
+        raise HTTPException(status_code=500, detail=str(e))
 
 
-def operation_to_method(op: str) -> str:
-    """Converts PascalCase URL param to snake_case method name if needed, 
-    but boto3 mostly uses snake_case.
-    Input from user might be 'InvokeModel' (Pascal) which maps to `invoke_model` (snake) in python.
+async def pump_body(body):
+    """
+    Relays an InvokeModel StreamingBody to the client as chunks arrive instead of buffering it.
+    Tees the first _LOG_BODY_LIMIT bytes for the response body log only when INFO is enabled.
+    The body is closed by `release_body` when the response ends.
+    """
+    log_enabled = logger.isEnabledFor(logging.INFO)
+    tee = bytearray()
+    async for chunk in body.iter_chunks(chunk_size=_BODY_CHUNK_SIZE):
+        if log_enabled and len(tee) < _LOG_BODY_LIMIT:
+            tee.extend(chunk[:_LOG_BODY_LIMIT - len(tee)])
+        yield chunk
+
+    if log_enabled:
+        logger.info("Bedrock Response Body: %s", tee.decode('utf-8', errors='replace'))
+
+
+async def release_body(body):
+    """
+    Closes an InvokeModel StreamingBody and frees its concurrency slot once its response is over,
+    whether the body was drained, abandoned mid-stream or never read.
     """
-    # Simple conversion: ConverseStream -> converse_stream
-    import re
-    # Convert PascalCase to snake_case
-    snake = re.sub(r'(?<!^)(?=[A-Z])', '_', op).lower()
-    # Convert kebab-case to snake_case
-    return snake.replace("-", "_")
+    body.close()
+    _BEDROCK_SEM.release()
 
 
-async def bedrock_stream_generator(body, method_name, client_kwargs, operation):
+async def bedrock_stream_generator(method, body, stream_key):
     """
     Yields events from Bedrock stream and logs usage from metadata events.
-    Manages client context to prevent premature closure.
+    The event stream is closed and the concurrency slot released however the stream ends.
     """
     input_tokens = 0
     output_tokens = 0
-    output_text = ""
+    parts: list[str] = []
+    # Checked once per stream; with INFO off no event is inspected after it is relayed
+    log_enabled = logger.isEnabledFor(logging.INFO)
     
+    # The connection stays checked out for the whole stream, so hold the slot until it ends
+    await _BEDROCK_SEM.acquire()
+    stream = None
     try:
-        async with session.client("bedrock-runtime", **client_kwargs) as client:
-            method = getattr(client, method_name, None)
-            if not method:
-                yield json.dumps({"error": f"Operation {operation} not found"}) + "\n"
-                return
+        response = await method(**body)
+        stream = response.get(stream_key)
 
-            response = await method(**body)
-            stream = response.get("body") if method_name == "invoke_model_with_response_stream" else response.get("stream")
-
-            async for event in stream:
-                # Yield the event as a JSON line
-                yield json.dumps(serialize_event(event)) + "\n"
-                
-                # Check for usage
-                # InvokeModelWithResponseStream often has internal structure dependent on model
-                # ConverseStream has explicit 'metadata' event
-                if "metadata" in event:
+        async for event in stream:
+            # Yield the event as an SSE message
+            yield b"data: " + orjson.dumps(serialize_event(event), default=_encode_blob) + b"\n\n"
+            
+            # Everything below only feeds the INFO summary lines
+            if not log_enabled:
+                continue
+
+            # Each stream event is a single-key dict: dispatch once on that key,
+            # most frequent kinds first
+            kind = next(iter(event), None)
+            if kind == "contentBlockDelta": # ConverseStream text delta
+                delta = event["contentBlockDelta"].get("delta", {})
+                if "text" in delta:
+                    parts.append(delta["text"])
+            elif kind == "chunk": # InvokeModelWithResponseStream
+                chunk = event["chunk"]
+                if "bytes" in chunk:
+                    # Parse the model payload once; it serves both the output text and the usage
+                    try:
+                        data = orjson.loads(chunk["bytes"])
+                    except orjson.JSONDecodeError:
+                        continue
+                    if not isinstance(data, dict):
+                        continue
+                    # Common formats: 'outputText', 'completion', 'delta'
+                    if "outputText" in data: parts.append(data["outputText"])
+                    elif "completion" in data: parts.append(data["completion"])
+                    elif "delta" in data and "text" in data["delta"]: parts.append(data["delta"]["text"]) # Claude
+                    # Usage is reported in the final chunk's invocation metrics
+                    metrics = data.get("amazon-bedrock-invocationMetrics")
+                    if metrics:
+                        input_tokens = metrics.get("inputTokenCount", 0)
+                        output_tokens = metrics.get("outputTokenCount", 0)
+            elif kind == "metadata": # ConverseStream usage
                 usage = event["metadata"].get("usage", {})
                 input_tokens = usage.get("inputTokens", 0)
                 output_tokens = usage.get("outputTokens", 0)
-            
-            # For InvokeModelWithResponseStream, usage might be in 'internalServerException' metadata or similar?
-            # Actually, standard InvokeModel stream usually doesn't send explicit usage event for all models, 
-            # but for some like Claude 3 it does in the final event or as a specific chunk.
-            
-            # Accumulate text for logging
-            if "chunk" in event:
-                 chunk = event["chunk"]
-                 if "bytes" in chunk:
-                     try:
-                         data = json.loads(chunk["bytes"])
-                         # Common formats: 'outputText', 'completion', 'delta'
-                         if "outputText" in data: output_text += data["outputText"]
-                         elif "completion" in data: output_text += data["completion"]
-                         elif "delta" in data and "text" in data["delta"]: output_text += data["delta"]["text"] # Claude
-                     except:
-                         pass
-            elif "contentBlockDelta" in event: # ConverseStream
-                 delta = event["contentBlockDelta"].get("delta", {})
-                 if "text" in delta:
-                     output_text += delta["text"]
 
     except Exception as e:
-        logger.error(f"Streaming Error: {e}")
-        yield json.dumps({"error": str(e)}) + "\n"
+        logger.error("Streaming Error: %s", e)
+        yield b"data: " + orjson.dumps({"error": str(e)}) + b"\n\n"
+    finally:
+        # Return the pooled connection before the slot admits another call
+        if stream is not None:
+            stream.close()
+        _BEDROCK_SEM.release()
     
     if input_tokens + output_tokens > 0:
-        logger.info(f"Bedrock Stream Finished | Tokens: {input_tokens + output_tokens} (Input: {input_tokens}, Output: {output_tokens})")
+        logger.info("Bedrock Stream Finished | Tokens: %d (Input: %d, Output: %d)", input_tokens + output_tokens, input_tokens, output_tokens)
     
-    logger.info(f"Bedrock Stream Output: {output_text}")
+    if log_enabled:
+        logger.info("Bedrock Stream Output: %s", "".join(parts))
 
 def serialize_event(event):
-    """Helper to handle bytes in event dictionary."""
-    new_event = {}
-    for k, v in event.items():
-        if isinstance(v, bytes):
-            new_event[k] = v.decode('utf-8') # Decode payload bytes
-        elif isinstance(v, dict):
-            new_event[k] = serialize_event(v)
-        else:
-            new_event[k] = v
-    return new_event
+    """Helper to handle bytes in event dictionary.
+
+    Decodes the InvokeModelWithResponseStream payload at `chunk.bytes`, which is UTF-8 JSON text.
+    Other events are returned as-is; the few blobs they can carry (e.g. ConverseStream
+    `contentBlockDelta.delta.reasoningContent.redactedContent`) are base64-encoded by
+    `_encode_blob` when the event is dumped.
+    """
+    chunk = event.get("chunk")
+    if chunk is not None:
+        payload = chunk.get("bytes")
+        if isinstance(payload, (bytes, bytearray)):
+            return {**event, "chunk": {**chunk, "bytes": payload.decode('utf-8')}} # Decode payload bytes
+    return event
+
+def _encode_blob(obj):
+    """orjson `default`: base64-encodes blob fields boto3 returns as bytes."""
+    if isinstance(obj, (bytes, bytearray)):
+        return base64.b64encode(obj).decode('ascii')
+    raise TypeError
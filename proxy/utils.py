@@ -1,15 +1,56 @@
 import logging
+import os
 import sys
-from typing import Any, Dict, Optional
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import orjson
+from fastapi.responses import StreamingResponse
 
 import queue
 from logging.handlers import QueueHandler, QueueListener
 
+# Bound on queued log records; when a slow sink falls behind, the oldest records are dropped
+LOG_QUEUE_SIZE = 65536
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that never blocks the caller: when the bounded queue is full the oldest
+    record is dropped so a slow terminal can't back up the event loop."""
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            try:
+                self.queue.get_nowait()
+                self.queue.put_nowait(record)
+            except (queue.Empty, queue.Full):
+                pass
+
+
+class DeferredQueueHandler(DroppingQueueHandler):
+    """DroppingQueueHandler that leaves all formatting to the listener thread.
+
+    The stdlib `prepare` merges msg/args (and so evaluates every log argument) on the emitting
+    thread; records are enqueued untouched instead. Only safe for loggers whose arguments are
+    not mutated after the call, i.e. the `proxy` logger; third-party records (botocore, httpx)
+    can reference live request dicts and keep the stock `prepare`.
+    """
+    def prepare(self, record):
+        return record
+
+
+class DrainingQueueListener(QueueListener):
+    """QueueListener whose stop sentinel waits for room instead of failing on a full queue."""
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
 # Setup Logging
 def setup_logging():
     """Configures the root logger to output JSON-like or structured English logs via a non-blocking queue."""
-    log_queue = queue.Queue(-1)
-    queue_handler = QueueHandler(log_queue)
+    log_queue = queue.Queue(LOG_QUEUE_SIZE)
+    queue_handler = DroppingQueueHandler(log_queue)
+    deferred_handler = DeferredQueueHandler(log_queue)
     
     console_handler = logging.StreamHandler(sys.stdout)
     formatter = logging.Formatter(
@@ -17,14 +58,51 @@ def setup_logging():
     )
     console_handler.setFormatter(formatter)
     
-    listener = QueueListener(log_queue, console_handler)
+    listener = DrainingQueueListener(log_queue, console_handler)
     listener.start()
     
     root_logger = logging.getLogger()
-    root_logger.setLevel(logging.INFO)
+    root_logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
     root_logger.addHandler(queue_handler)
     
+    # The proxy logger enqueues directly instead of walking up to the root logger;
+    # formatting and I/O only ever happen on the listener thread's handler.
+    proxy_logger = logging.getLogger("proxy")
+    proxy_logger.addHandler(deferred_handler)
+    proxy_logger.propagate = False
+    
     # Return logger and listener (to stop it later if needed)
-    return logging.getLogger("proxy"), listener
+    return proxy_logger, listener
 
 logger, log_listener = setup_logging()
+
+
+class LazyJSON:
+    """Log argument that serializes `obj` with orjson only when the record is actually formatted.
+
+    Use with %-style logging: `logger.info("Body: %s", LazyJSON(body))`.
+    """
+    __slots__ = ("obj",)
+
+    def __init__(self, obj: Any):
+        self.obj = obj
+
+    def __str__(self) -> str:
+        return orjson.dumps(self.obj, default=str).decode()
+
+
+class ClosingStreamingResponse(StreamingResponse):
+    """StreamingResponse that awaits `on_close()` once the response is over, however it ended.
+
+    A body generator's `finally` never runs if the client disconnects before the body is first
+    iterated, so upstream streams and concurrency slots are released here instead.
+    """
+    def __init__(self, content, on_close: Callable[[], Awaitable[None]], **kwargs):
+        super().__init__(content, **kwargs)
+        self.on_close = on_close
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.on_close()
@@ -0,0 +1,22 @@
+from fastapi.testclient import TestClient
+
+
+def test_app_starts_and_serves_health(monkeypatch):
+    # Static credentials keep client construction off the instance metadata endpoint
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "test")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "test")
+    monkeypatch.delenv("AWS_ROLE_ARN", raising=False)
+
+    import main
+    from proxy.routers import bedrock
+
+    with TestClient(main.app) as client:
+        assert client.get("/health").status_code == 200
+
+        dispatch = bedrock._DISPATCH["bedrock-runtime"]
+        assert dispatch["InvokeModel"][0] == "invoke_model"
+        assert dispatch["invokeModel"] is dispatch["invoke_model"] is dispatch["invoke-model"]
+        assert dispatch["ConverseStream"][2] == "stream"
+
+        assert client.post("/bedrock/runtime/Close", json={}).status_code == 404
+        assert client.post("/bedrock/agent-runtime/close", json={}).status_code == 404